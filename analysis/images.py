@@ -14,8 +14,9 @@ def image_to_real(
 
     Parameters
     ----------
-    point_image : array_like
+    point_image : (3,) or (N, 3) array_like
         Point in image coordinates.
+        Multiple points can be converted at once.
     x_res, y_res : int
         Resolution of image in x and y axes.
     f_xz, f_yz : {float, int}
@@ -23,7 +24,7 @@ def image_to_real(
 
     Returns
     -------
-    point_real : ndarray
+    point_real : (3,) or (N, 3) ndarray
         Point in real world coordinates.
 
     Examples
@@ -37,8 +38,13 @@ def image_to_real(
     >>> np.round(point_real)
     array([10.,  5.,  3.])
 
+    >>> np.round(image_to_real([point_image, point_image], x_res, y_res, f_xz, f_yz))
+    array([[10.,  5.,  3.],
+           [10.,  5.,  3.]])
+
     """
-    x_image, y_image, z_image = point_image
+    # The coordinates are the last axis, so multiple points are converted at once.
+    x_image, y_image, z_image = np.moveaxis(np.asarray(point_image), -1, 0)
 
     f_normalized_x = x_image / x_res - 0.5
     f_normalized_y = 0.5 - y_image / y_res
@@ -47,7 +53,7 @@ def image_to_real(
     y_real = f_normalized_y * z_image * f_yz
     z_real = z_image
 
-    point_real = np.array([x_real, y_real, z_real])
+    point_real = np.stack((x_real, y_real, z_real), axis=-1)
 
     return point_real
 
@@ -60,8 +66,9 @@ def real_to_image(
 
     Parameters
     ----------
-    point_real : array_like
+    point_real : (3,) or (N, 3) array_like
         Point in real world coordinates.
+        Multiple points can be converted at once.
     x_res, y_res : int
         Resolution of image in x and y axes.
     f_xz, f_yz : {float, int}
@@ -69,7 +76,7 @@ def real_to_image(
 
     Returns
     -------
-    point_image : ndarray
+    point_image : (3,) or (N, 3) ndarray
         Point in image coordinates.
 
     Examples
@@ -83,17 +90,22 @@ def real_to_image(
     >>> np.round(point_image, 2)
     array([2239.39, -719.69,    3.  ])
 
+    >>> np.round(real_to_image([point_real, [-10, -5, 3]], x_res, y_res, f_xz, f_yz), 2)
+    array([[ 2239.39,  -719.69,     3.  ],
+           [-1599.39,  1199.69,     3.  ]])
+
     """
     f_coeff_x = x_res / f_xz
     f_coeff_y = y_res / f_yz
 
-    x_real, y_real, z_real = point_real
+    # The coordinates are the last axis, so multiple points are converted at once.
+    x_real, y_real, z_real = np.moveaxis(np.asarray(point_real), -1, 0)
 
     x_image = f_coeff_x * x_real / z_real + 0.5 * x_res
     y_image = 0.5 * y_res - f_coeff_y * y_real / z_real
     z_image = z_real
 
-    point_image = np.array([x_image, y_image, z_image])
+    point_image = np.stack((x_image, y_image, z_image), axis=-1)
 
     return point_image
 
@@ -153,16 +165,17 @@ def recalibrate_positions(
     -------
     positions_real : ndarray
         Positions in new real world coordinates.
+        The dtype is the same as the original positions.
 
     """
-    positions_real = np.full(positions_real_orig.shape, np.nan)
-
-    for i, pos_real_orig in enumerate(positions_real_orig):
-
-        pos_image = real_to_image(pos_real_orig, x_res_orig, y_res_orig, f_xz, f_yz)
-        positions_real[i] = image_to_real(pos_image, x_res, y_res, f_xz, f_yz)
-
-    return positions_real
+    # All positions are converted at once.
+    # The conversion is done in double precision, then cast back to the original dtype.
+    positions_image = real_to_image(
+        positions_real_orig.astype(float), x_res_orig, y_res_orig, f_xz, f_yz
+    )
+    positions_real = image_to_real(positions_image, x_res, y_res, f_xz, f_yz)
+
+    return positions_real.astype(positions_real_orig.dtype, copy=False)
 
 
 # Camera calibration parameters.
@@ -6,6 +6,7 @@ import numpy as np
 import pandas as pd
 from matplotlib import cm
 from matplotlib.axes import Axes
+from matplotlib.collections import LineCollection, PatchCollection
 
 from modules.typing import array_like
 
@@ -41,6 +42,8 @@ def scatter_labels(ax: Axes, points: np.ndarray, labels: np.ndarray, **kwargs):
     """
     Scatter points that are coloured by label.
 
+    The labels are mapped to colours by the colormap of `scatter`.
+
     Parameters
     ----------
     ax: Axes
@@ -53,11 +56,7 @@ def scatter_labels(ax: Axes, points: np.ndarray, labels: np.ndarray, **kwargs):
         Additional keywords passed to `scatter`.
 
     """
-    for label in np.unique(labels):
-
-        points_label = points[labels == label]
-
-        ax.scatter(points_label[:, 0], points_label[:, 1], **kwargs)
+    ax.scatter(points[:, 0], points[:, 1], c=labels, **kwargs)
 
 
 def scatter2(ax: Axes, points: np.ndarray, **kwargs):
@@ -128,15 +127,25 @@ def connect_two_sets(ax: Axes, points_1: array_like, points_2: array_like, **kwa
     ----------
     ax: Axes
         Matplotlib Axes object.
-    points_1, points_2 : (N, 2) array_like
+    points_1 : (N, 2) array_like
+        Input 2D points.
+    points_2 : (M, 2) array_like
         Input 2D points.
     kwargs : dict, optional
-        Additional keywords passed to `plot`.
+        Additional keywords passed to `LineCollection`.
 
     """
-    for point_1 in points_1:
-        for point_2 in points_2:
-            connect_points(ax, point_1, point_2, **kwargs)
+    points_1, points_2 = np.asarray(points_1), np.asarray(points_2)
+    n_points_1, n_points_2 = len(points_1), len(points_2)
+
+    # Pair each point in the first set with each point in the second set
+    points_start = np.repeat(points_1[:, :2], n_points_2, axis=0)
+    points_end = np.tile(points_2[:, :2], (n_points_1, 1))
+
+    segments = np.stack((points_start, points_end), axis=1)
+
+    ax.add_collection(LineCollection(segments, **kwargs))
+    ax.autoscale_view()
 
 
 def plot_spheres(ax: Axes, points: array_like, r: float):
@@ -153,9 +162,10 @@ def plot_spheres(ax: Axes, points: array_like, r: float):
         Radius of spheres.
 
     """
-    for point in points:
-        circle = plt.Circle((point[0], point[1]), radius=r, color="black", fill=False)
-        ax.add_patch(circle)
+    circles = [plt.Circle((point[0], point[1]), radius=r) for point in points]
+
+    ax.add_collection(PatchCollection(circles, edgecolor="black", facecolor="none"))
+    ax.autoscale_view()
 
 
 def plot_links(
@@ -177,19 +187,18 @@ def plot_links(
         Element i is True if position i is inside the combined sphere volume.
 
     """
-    for i, point_i in enumerate(points):
-        for j, point_j in enumerate(points):
+    points = np.asarray(points)
+
+    # Element (i, j) is True if the link from i to j is drawn.
+    # Both points must be inside the spheres and the link must have a score.
+    is_link = np.logical_and.outer(inside_spheres, inside_spheres) & (score_matrix != 0)
+    index_i, index_j = np.nonzero(is_link)
 
-            if inside_spheres[i] and inside_spheres[j]:
-                score = score_matrix[i, j]
+    # Lines between the 2D views of the points, coloured by score
+    segments = np.stack((points[index_i, :2], points[index_j, :2]), axis=1)
+    colours = cm.bwr(score_matrix[index_i, index_j])
 
-                if score != 0:
-                    # Plot line coloured by score
-                    connect_points(
-                        ax,
-                        point_i,
-                        point_j,
-                        c=cm.bwr(score),
-                        linestyle='-',
-                        linewidth=0.75,
-                    )
+    ax.add_collection(
+        LineCollection(segments, colors=colours, linestyle='-', linewidth=0.75)
+    )
+    ax.autoscale_view()
@@ -1,11 +1,11 @@
 """Module for clustering points in space."""
 
-from queue import Queue
-from typing import Any
+from typing import Optional
 
 import numpy as np
 from numpy import ndarray
-from scipy.spatial.distance import cdist
+from scipy.sparse import csr_matrix
+from scipy.spatial import cKDTree
 
 from modules.typing import array_like
 
@@ -49,51 +49,41 @@ def dbscan_st(
     array([0, 0, 0, 1, 1, 1])
 
     """
-    D_spatial = cdist(points, points)
-
     n_points = len(points)
 
-    if times is None:
-        times = np.zeros(n_points)
+    # Element (i, j) is True if point j is in the spatiotemporal neighbourhood of point i.
+    adj_matrix = adjacency_st(points, times, eps_spatial, eps_temporal)
+
+    # Size of the neighbourhood of each point.
+    n_neighbours = np.diff(adj_matrix.indptr)
 
-    times = np.array(times).reshape(-1, 1)
-    D_temporal = cdist(times, times)
+    # Only core points can be seed points.
+    # The neighbourhood of any other point is smaller than the minimum.
+    index_core = np.flatnonzero(n_neighbours >= min_pts)
 
     labels = np.zeros(n_points, dtype=int)
 
     label_cluster = 0
 
-    for idx_pt in range(n_points):
+    for idx_pt in index_core:
 
         if labels[idx_pt] != 0:
-            # Only unlabelled points can be considered as seed points.
+            # The core point has already been claimed by a cluster.
             continue
 
-        set_neighbours = region_query_st(
-            D_spatial, D_temporal, eps_spatial, eps_temporal, idx_pt
-        )
+        label_cluster += 1
 
-        if len(set_neighbours) < min_pts:
-            # The neighbourhood of the point is smaller than the minimum.
-            # The point is marked as noise.
-            labels[idx_pt] = -1
+        # Assign the point to the current cluster
+        labels[idx_pt] = label_cluster
 
-        else:
-            label_cluster += 1
+        neighbours = adj_matrix[idx_pt].indices
 
-            # Assign the point to the current cluster
-            labels[idx_pt] = label_cluster
+        grow_cluster_st(
+            adj_matrix, n_neighbours, labels, neighbours, label_cluster, min_pts
+        )
 
-            grow_cluster_st(
-                D_spatial,
-                D_temporal,
-                labels,
-                set_neighbours,
-                label_cluster,
-                eps_spatial,
-                eps_temporal,
-                min_pts,
-            )
+    # The points that were not reached from any core point are marked as noise.
+    labels[labels == 0] = -1
 
     # Subtract 1 from non-noise labels so they begin at zero (this is consistent with scikit-learn).
     labels[labels != -1] -= 1
@@ -101,14 +91,94 @@ def dbscan_st(
     return labels
 
 
+def adjacency_st(
+    points: array_like,
+    times: Optional[array_like],
+    eps_spatial: float,
+    eps_temporal: float,
+) -> csr_matrix:
+    """
+    Return the spatiotemporal adjacency matrix for DBSCAN.
+
+    The spatial neighbours are found with a k-d tree,
+    so the full matrix of distances between points is never computed.
+
+    Parameters
+    ----------
+    points : (N, D) array_like
+        Array of N points with dimension D.
+    times : (N,) array_like or None
+        Array of N times corresponding to the points.
+        If None, only the spatial neighbourhoods are used.
+    eps_spatial : float
+        Maximum distance between two points for one to be
+        considered in the neighbourhood of the other.
+    eps_temporal : float
+        Maximum distance between two times for one to be
+        considered in the neighbourhood of the other.
+
+    Returns
+    -------
+    adj_matrix : (N, N) csr_matrix
+        Sparse boolean matrix.
+        Element (i, j) is True if point j is in both the spatial and
+        temporal neighbourhoods of point i.
+
+    Examples
+    --------
+    >>> points = [[0, 0], [1, 0], [2, 0], [0, 5], [1, 5], [2, 5]]
+    >>> times = [1, 2, 3, 4, 5, 1]
+
+    >>> adjacency_st(points, times, 1, 1).toarray()
+    array([[ True,  True, False, False, False, False],
+           [ True,  True,  True, False, False, False],
+           [False,  True,  True, False, False, False],
+           [False, False, False,  True,  True, False],
+           [False, False, False,  True,  True, False],
+           [False, False, False, False, False,  True]])
+
+    """
+    n_points = len(points)
+    points = np.reshape(np.asarray(points, dtype=float), (n_points, -1))
+
+    # Points with a non-finite coordinate have no spatial neighbours,
+    # so they are left out of the tree.
+    is_finite = np.isfinite(points).all(axis=1)
+    index_finite = np.flatnonzero(is_finite)
+
+    # Pairs of points (i, j) with i < j that are spatial neighbours.
+    pairs = cKDTree(points[index_finite]).query_pairs(
+        eps_spatial, output_type='ndarray'
+    )
+    pairs = index_finite[pairs]
+
+    if times is not None:
+        # Keep the pairs that are also temporal neighbours.
+        # The time differences are only computed for the spatial neighbours.
+        times = np.ravel(times)
+
+        is_temporal = np.abs(times[pairs[:, 0]] - times[pairs[:, 1]]) <= eps_temporal
+        pairs = pairs[is_temporal]
+
+        is_finite &= np.isfinite(times)
+
+    # Each point is in its own neighbourhood, unless its position or time is not finite.
+    index_points = np.flatnonzero(is_finite)
+
+    rows = np.concatenate((pairs[:, 0], pairs[:, 1], index_points))
+    cols = np.concatenate((pairs[:, 1], pairs[:, 0], index_points))
+
+    return csr_matrix(
+        (np.ones(len(rows), dtype=bool), (rows, cols)), shape=(n_points, n_points)
+    )
+
+
 def grow_cluster_st(
-    D_spatial: ndarray,
-    D_temporal: ndarray,
+    adj_matrix: csr_matrix,
+    n_neighbours: ndarray,
     labels: ndarray,
-    set_neighbours: set,
+    neighbours: ndarray,
     label_cluster: int,
-    eps_spatial: float,
-    eps_temporal: float,
     min_pts: int,
 ) -> None:
     """
@@ -116,22 +186,18 @@ def grow_cluster_st(
 
     Parameters
     ----------
-    D_spatial : (N, N) ndarray
-        Matrix of distances between points.
-    D_temporal : (N, N) ndarray
-        Matrix of distances between times.
+    adj_matrix : (N, N) csr_matrix
+        Sparse boolean matrix.
+        Element (i, j) is True if point j is in the neighbourhood of point i.
+    n_neighbours : (N,) ndarray
+        Size of the neighbourhood of each point.
     labels : (N,) ndarray
         Array of cluster labels.
-    set_neighbours : set
-        Set of indices for neighbours of the seed point.
+        Unclaimed points are labelled 0, and points marked as noise are labelled -1.
+    neighbours : ndarray
+        Indices for neighbours of the seed point.
     label_cluster : int
         Label of the current cluster.
-    eps_spatial : float
-        Maximum distance between two points for one to be
-        considered in the neighbourhood of the other.
-    eps_temporal : float
-        Maximum distance between two times for one to be
-        considered in the neighbourhood of the other.
     min_pts : int
         Number of points in a neighbourhood for a point to be considered
         a core point.
@@ -143,54 +209,50 @@ def grow_cluster_st(
     >>> idx_pt, label = 0, 1
     >>> eps_spatial, eps_temporal, min_pts = 1, 1, 2
 
-    >>> D_spatial = cdist(points, points)
-    >>> D_temporal = np.zeros_like(D_spatial)
+    >>> adj_matrix = adjacency_st(points, None, eps_spatial, eps_temporal)
+    >>> n_neighbours = np.diff(adj_matrix.indptr)
 
     >>> labels = np.zeros(len(points))
 
-    >>> set_neighbours = region_query_st(D_spatial, D_temporal, eps_spatial, eps_temporal, idx_pt)
+    >>> neighbours = adj_matrix[idx_pt].indices
 
-    >>> grow_cluster_st(D_spatial, D_temporal, labels, set_neighbours, label, eps_spatial, eps_temporal, min_pts)
+    >>> grow_cluster_st(adj_matrix, n_neighbours, labels, neighbours, label, min_pts)
 
     >>> labels
     array([1., 1., 1., 0., 0., 0.])
 
     """
-    # Initialize a queue with the current neighbourhood.
-    queue_search: Any = Queue()
-
-    for i in set_neighbours:
-        queue_search.put(i)
+    # Element i is True if point i has been reached from the seed point.
+    # Each point only needs to be searched once while growing the cluster.
+    is_reached = np.zeros(len(labels), dtype=bool)
+    is_reached[neighbours] = True
 
-    while not queue_search.empty():
+    # Search outwards from the seed point one layer of neighbours at a time.
+    frontier = neighbours
 
-        # Consider the next point in the queue.
-        idx_next = queue_search.get()
+    while frontier.size:
 
-        label_next = labels[idx_next]
+        labels_frontier = labels[frontier]
 
-        if label_next == -1:
-            # This neighbour was labelled as noise.
-            # It is now a border point of the cluster.
-            labels[idx_next] = label_cluster
+        # dbscan_st only marks noise after all clusters are grown, so a label of -1
+        # only comes from a caller that passes noise already marked.
+        # These neighbours become border points, and unclaimed neighbours are added to the cluster.
+        is_unclaimed = labels_frontier == 0
+        labels[frontier[is_unclaimed | (labels_frontier == -1)]] = label_cluster
 
-        elif label_next == 0:
-            # The neighbour was unclaimed.
-            # Add the next point to the cluster.
-            labels[idx_next] = label_cluster
+        # The neighbourhoods of the unclaimed core points are searched next.
+        frontier_unclaimed = frontier[is_unclaimed]
+        frontier_core = frontier_unclaimed[n_neighbours[frontier_unclaimed] >= min_pts]
 
-            set_neighbours_next = region_query_st(
-                D_spatial, D_temporal, eps_spatial, eps_temporal, idx_next
-            )
+        neighbours_next = np.unique(adj_matrix[frontier_core].indices)
 
-            if len(set_neighbours_next) >= min_pts:
-                # The next point is a core point.
-                # Add its neighbourhood to the queue to be searched.
-                for i in set_neighbours_next:
-                    queue_search.put(i)
+        frontier = neighbours_next[~is_reached[neighbours_next]]
+        is_reached[frontier] = True
 
 
-def region_query(dist_matrix: ndarray, eps: float, idx_pt: int) -> set:
+def region_query(
+    dist_matrix: ndarray, eps: float, idx_pt: int, out: Optional[ndarray] = None
+) -> ndarray:
     """
     Find which points are within a distance `eps` of the point with index `idx_pt`.
 
@@ -203,27 +265,36 @@ def region_query(dist_matrix: ndarray, eps: float, idx_pt: int) -> set:
         considered in the neighbourhood of the other.
     idx_pt : int
         Index of the current point.
+    out : (N,) ndarray, optional
+        Boolean buffer for the comparison with `eps`.
+        Passing the same buffer to repeated queries avoids allocating a new array each time.
 
     Returns
     -------
-    set
-        Set of indices for the points neighbouring the current point.
+    ndarray
+        Indices of the points neighbouring the current point.
 
     Examples
     --------
+    >>> from scipy.spatial.distance import cdist
+
     >>> points = [[0, 0], [1, 0], [2, 0], [0, 5], [1, 5], [2, 5]]
 
     >>> dist_matrix = cdist(points, points)
 
     >>> region_query(dist_matrix, 0.5, 0)
-    {0}
+    array([0])
     >>> region_query(dist_matrix, 1, 0)
-    {0, 1}
-    >>> region_query(dist_matrix, 5, 0)
-    {0, 1, 2, 3}
+    array([0, 1])
+
+    >>> out = np.empty(len(points), dtype=bool)
+    >>> region_query(dist_matrix, 5, 0, out=out)
+    array([0, 1, 2, 3])
 
     """
-    return set(np.nonzero(dist_matrix[idx_pt] <= eps)[0])
+    is_neighbour = np.less_equal(dist_matrix[idx_pt], eps, out=out)
+
+    return np.flatnonzero(is_neighbour)
 
 
 def region_query_st(
@@ -232,11 +303,12 @@ def region_query_st(
     eps_spatial: float,
     eps_temporal: float,
     idx_pt: int,
-) -> set:
+) -> ndarray:
     """
     Perform spatiotemporal region query for DBSCAN.
 
     Returns the intersection of spatial and temporal reqion queries.
+    The intersection is taken with a logical AND of the two boolean rows.
 
     Parameters
     ----------
@@ -255,28 +327,30 @@ def region_query_st(
 
     Returns
     -------
-    set
-        Intersection of the spatial and temporal neighbourhoods.
+    ndarray
+        Indices of the points in both the spatial and temporal neighbourhoods.
 
     Examples
     --------
+    >>> from scipy.spatial.distance import cdist
+
     >>> points = [[0, 0], [1, 0], [2, 0], [0, 5], [1, 5], [2, 5]]
-    >>> times = np.row_stack([1, 2, 3, 4, 5, 1])
+    >>> times = np.array([1, 2, 3, 4, 5, 1])
 
     >>> eps_spatial, eps_temporal = 1, 5
     >>> idx_pt = 5
 
     >>> D_spatial = cdist(points, points)
-    >>> D_temporal = cdist(times, times)
+    >>> D_temporal = np.abs(np.subtract.outer(times, times))
 
     >>> region_query_st(D_spatial, D_temporal, eps_spatial, eps_temporal, idx_pt)
-    {4, 5}
+    array([4, 5])
 
     >>> region_query_st(D_spatial, D_temporal, eps_spatial, 1, idx_pt)
-    {5}
+    array([5])
 
     """
-    set_neighbours_spatial = region_query(D_spatial, eps_spatial, idx_pt)
-    set_neighbours_temporal = region_query(D_temporal, eps_temporal, idx_pt)
+    is_neighbour = np.less_equal(D_spatial[idx_pt], eps_spatial)
+    np.logical_and(is_neighbour, D_temporal[idx_pt] <= eps_temporal, out=is_neighbour)
 
-    return set_neighbours_spatial.intersection(set_neighbours_temporal)
+    return np.flatnonzero(is_neighbour)
@@ -6,7 +6,6 @@ import numpy as np
 import pandas as pd
 from numpy import ndarray
 
-import modules.iterable_funcs as itf
 from modules.typing import adj_list, array_like, func_ab
 
 
@@ -144,6 +143,72 @@ def dag_shortest_paths(
     return prev, dist
 
 
+def dag_shortest_paths_matrix(
+    adj_matrix: ndarray, order: array_like, source_nodes: array_like
+) -> Tuple[ndarray, ndarray]:
+    """
+    Compute shortest path to each node on a directed acyclic graph.
+
+    This is the array form of `dag_shortest_paths`.
+    Each node relaxes all of its outgoing edges in one vectorized step.
+
+    Parameters
+    ----------
+    adj_matrix : (N, N) ndarray
+        Adjacency matrix.
+        Element (u, v) is the weight from node u to node v.
+        The element is nan if there is no edge from u to v.
+    order : array_like
+        Topological ordering of the nodes.
+        For each edge u to v, u comes before v in the ordering.
+    source_nodes : array_like
+        Source nodes.
+        The shortest path can begin at any of these nodes.
+
+    Returns
+    -------
+    prev : (N,) ndarray
+        For each node u in the graph, prev[u] is the previous node
+        on the shortest path to u.
+        The value is -1 if there is no previous node.
+    dist : (N,) ndarray
+        For each node u in the graph, dist[u] is the total distance (weight)
+        of the shortest path to u.
+
+    Examples
+    --------
+    >>> graph = {0: {1: 10, 2: 20}, 1: {3: 5}, 2: {3: 8, 4: 15}, 3: {4: 6}, 4: {}}
+    >>> adj_matrix = adj_list_to_matrix(graph)
+
+    >>> prev, dist = dag_shortest_paths_matrix(adj_matrix, range(5), [0, 1])
+
+    >>> prev
+    array([-1, -1,  0,  1,  3])
+
+    >>> dist
+    array([ 0.,  0., 20.,  5., 11.])
+
+    """
+    n_nodes = len(adj_matrix)
+
+    dist = np.full(n_nodes, np.inf)
+    prev = np.full(n_nodes, -1)
+
+    dist[np.asarray(list(source_nodes), dtype=int)] = 0
+
+    for u in order:
+
+        # A missing edge has nan weight, so it is never shorter.
+        dist_via_u = dist[u] + adj_matrix[u]
+        is_shorter = dist_via_u < dist
+
+        # Relax the edges
+        dist[is_shorter] = dist_via_u[is_shorter]
+        prev[is_shorter] = u
+
+    return prev, dist
+
+
 def trace_path(prev: Mapping, target_node: Any) -> list:
     """
     Trace back a path through a graph.
@@ -236,6 +301,74 @@ def labelled_nodes_to_graph(
     return graph
 
 
+def points_to_adj_matrix(
+    dist_matrix: ndarray,
+    labels: array_like,
+    label_adj_list: adj_list,
+    weight_func: func_ab,
+) -> ndarray:
+    """
+    Construct a weighted adjacency matrix from a set of labelled points in space.
+
+    Parameters
+    ----------
+    dist_matrix : ndarray
+        Distance matrix of the points.
+    labels : array_like
+        Label of each point.
+        The labels are integers from zero to the number of labels minus one.
+    label_adj_list : dict
+        Adjacency list for the labels.
+        label_adj_list[A][B] is the expected distance between
+        a point with label A and a point with label B.
+        There must be a key for each label.
+    weight_func : function
+        Cost function that takes two arrays as input.
+
+    Returns
+    -------
+    ndarray
+        Adjacency matrix of the points.
+        The element is nan if there is no edge between two points.
+
+    Examples
+    --------
+    >>> from scipy.spatial.distance import cdist
+
+    >>> points = np.array([[0, 3], [0, 10], [2, 3]])
+    >>> labels = [0, 1, 1]
+    >>> expected_dists = {0: {1: 5}, 1: {}}
+    >>> weight_func = lambda a, b: abs(a - b)
+
+    >>> dist_matrix = cdist(points, points)
+    >>> points_to_adj_matrix(dist_matrix, labels, expected_dists, weight_func)
+    array([[nan,  2.,  3.],
+           [nan, nan, nan],
+           [nan, nan, nan]])
+
+    """
+    # Expected distances between labels
+    label_dist = adj_list_to_matrix(label_adj_list)
+
+    # Pairs of points with an expected distance, looked up by the labels of each pair
+    labels = np.asarray(labels)
+    is_edge = ~np.isnan(label_dist)[np.ix_(labels, labels)]
+    index_u, index_v = np.nonzero(is_edge)
+
+    dists_expected = label_dist[labels[index_u], labels[index_v]]
+
+    # Adjacency matrix defined by a weight function
+    # The function is only evaluated on the edges, which are a small part of the matrix.
+    # Integer distances give floating point weights, so the missing edges can be nan.
+    dtype = np.result_type(dist_matrix.dtype, np.float32)
+    adj_matrix = np.full(dist_matrix.shape, np.nan, dtype=dtype)
+    adj_matrix[index_u, index_v] = weight_func(
+        dist_matrix[index_u, index_v], dists_expected
+    )
+
+    return adj_matrix
+
+
 def points_to_graph(
     dist_matrix: ndarray,
     labels: ndarray,
@@ -251,10 +384,12 @@ def points_to_graph(
         Distance matrix of the points.
     labels : array_like
         Label of each point.
+        The labels are integers from zero to the number of labels minus one.
     label_adj_list : dict
         Adjacency list for the labels.
         label_adj_list[A][B] is the expected distance between
         a point with label A and a point with label B.
+        There must be a key for each label.
     weight_func : function
         Cost function that takes two arrays as input.
 
@@ -277,13 +412,6 @@ def points_to_graph(
     {0: {1: 2.0, 2: 3.0}, 1: {}, 2: {}}
 
     """
-    label_dict = itf.iterable_to_dict(labels)
-
-    # Expected distances between points
-    adj_list_expected = labelled_nodes_to_graph(label_dict, label_adj_list)
-    dist_matrix_expected = adj_list_to_matrix(adj_list_expected)
-
-    # Adjacency matrix defined by a weight function
-    adj_matrix = weight_func(dist_matrix, dist_matrix_expected)
+    adj_matrix = points_to_adj_matrix(dist_matrix, labels, label_adj_list, weight_func)
 
     return adj_matrix_to_list(adj_matrix)
@@ -15,14 +15,17 @@ def consecutive_dist(points: array_like) -> ndarray:
     """
     Calculate the distance between each consecutive pair of points.
 
+    The points can also be a stack of point sets,
+    so the distances of many sets are calculated at once.
+
     Parameters
     ----------
-    points : array_like
-        List of points.
+    points : (..., N, D) array_like
+        List of N points with dimension D.
 
     Returns
     -------
-    ndarray
+    (..., N - 1) ndarray
         Distance between consecutive points.
 
     Examples
@@ -31,10 +34,14 @@ def consecutive_dist(points: array_like) -> ndarray:
     >>> consecutive_dist(points)
     array([1., 2.])
 
+    >>> consecutive_dist([points, [[0, 0], [3, 4], [3, 5]]])
+    array([[1., 2.],
+           [5., 1.]])
+
     """
-    differences = np.diff(points, axis=0)
+    differences = np.diff(points, axis=-2)
 
-    return norm(differences, axis=1)
+    return norm(differences, axis=-1)
 
 
 def closest_point(points: array_like, target: array_like) -> Tuple[ndarray, int]:
@@ -4,17 +4,17 @@ Module for estimating the pose of a walking person.
 The pose is estimated by selecting body parts from a set of hypotheses.
 
 """
+
 import itertools
-from typing import Mapping, Sequence, Tuple, cast
+from typing import Sequence, Tuple
 
 import numpy as np
 import pandas as pd
 from numpy import ndarray
-from scipy.spatial.distance import cdist
+from scipy.spatial.distance import pdist, squareform
 
 import modules.graphs as gr
-import modules.math_funcs as mf
-from modules.constants import PART_CONNECTIONS, PART_TYPES, TYPE_CONNECTIONS
+from modules.constants import PART_TYPES, TYPE_CONNECTIONS
 from modules.typing import adj_list, array_like, func_ab
 
 
@@ -23,9 +23,28 @@ def cost_func(a: float, b: float) -> float:
     return (a - b) ** 2
 
 
-def score_func(a: float, b: float) -> float:
-    """Score function for scoring links between body parts."""
-    x = 1 / mf.norm_ratio(a, b)
+def score_func(a: array_like, b: array_like) -> ndarray:
+    """
+    Score function for scoring links between body parts.
+
+    The inputs can be arrays, so many links are scored in one call.
+    The score is not finite if an input is zero.
+
+    Examples
+    --------
+    >>> score_func(10, 10)
+    1.0
+
+    >>> score_func([5, 10, 20], [10, 10, 10])
+    array([0., 1., 0.])
+
+    """
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+
+    # Reciprocal of the normalized ratio between a and b (see norm_ratio in math_funcs).
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = np.maximum(a, b) / np.minimum(a, b)
+
     return -((x - 1) ** 2) + 1
 
 
@@ -54,7 +73,8 @@ def measure_min_path(
         Lengths on the minimum shortest path.
 
     """
-    dist_matrix = cdist(population, population)
+    # The distances stay in double precision because they become the measured lengths.
+    dist_matrix = squareform(pdist(population))
     prev, dist = pop_shortest_paths(dist_matrix, labels, label_adj_list, cost_func)
 
     # Get shortest path to each foot
@@ -88,7 +108,12 @@ def estimate_lengths(df_hypo_trial: pd.DataFrame, **kwargs) -> ndarray:
     n_frames = df_hypo_trial.shape[0]
     n_lengths = len(PART_TYPES) - 1
 
-    matrix_lengths_measured = np.full((n_frames, n_lengths), np.nan)
+    # Allocated once and reused on each iteration.
+    # Only the rows of the frames processed so far are read.
+    matrix_lengths_measured = np.empty((n_frames, n_lengths))
+
+    # Read the frames from the DataFrame once instead of on each iteration.
+    frames = [*zip(df_hypo_trial.population, df_hypo_trial.labels)]
 
     lengths_estimated = np.zeros(n_lengths)
     lengths_prev = np.full(n_lengths, np.inf)
@@ -99,11 +124,12 @@ def estimate_lengths(df_hypo_trial: pd.DataFrame, **kwargs) -> ndarray:
         label_adj_list_types = lengths_to_adj_list(TYPE_CONNECTIONS, lengths_estimated)
 
         medians_prev = np.full(n_lengths, np.inf)  # Initiate medians.
-        lengths_prev = np.copy(lengths_estimated)  # Record previous lengths.
+        lengths_prev = lengths_estimated  # Record previous lengths.
 
-        for i, tuple_frame in enumerate(df_hypo_trial.itertuples()):
+        # The estimate stays the same if the trial has no frames.
+        medians = lengths_estimated
 
-            population, labels = tuple_frame.population, tuple_frame.labels
+        for i, (population, labels) in enumerate(frames):
 
             lengths_measured = measure_min_path(
                 population, labels, label_adj_list_types
@@ -115,10 +141,14 @@ def estimate_lengths(df_hypo_trial: pd.DataFrame, **kwargs) -> ndarray:
             medians = np.median(matrix_lengths_so_far, axis=0)
 
             if np.allclose(medians, medians_prev, **kwargs):
-                lengths_estimated = np.copy(medians)
                 break
 
-            medians_prev = np.copy(medians)
+            medians_prev = medians
+
+        # The medians are the new estimate even if they did not converge
+        # within the trial. Otherwise, the estimate would stay the same
+        # and the outer loop would wrongly stop.
+        lengths_estimated = medians
 
         if np.allclose(lengths_estimated, lengths_prev, **kwargs):
             break
@@ -166,19 +196,24 @@ def get_population(
     array([0, 5, 5])
 
     """
-    pop_list, label_list = [], []
+    list_points = [np.asarray(points) for points in list_frame_points]
+    counts = [len(points) for points in list_points]
 
-    for index_points, label in zip(list_frame_points, part_labels):
+    # Join the points of all body parts at once.
+    # Parts without points are left out, as an empty list cannot be joined to (n, 3) arrays.
+    list_points_nonempty = [points for points in list_points if len(points)]
 
-        for point in index_points:
+    if list_points_nonempty:
+        population = np.concatenate(list_points_nonempty)
+    else:
+        # A frame without any points has an empty population.
+        population = np.empty((0, 3))
 
-            pop_list.append(point)
-            label_list.append(label)
-
-    population, labels = np.array(pop_list), np.array(label_list)
+    labels = np.repeat(np.asarray(part_labels), counts)
 
     # Sort the labels and apply the sorting to the points
-    sort_index = np.argsort(labels)
+    # A stable sort keeps the order of the points within each label.
+    sort_index = np.argsort(labels, kind='stable')
     population, labels = population[sort_index], labels[sort_index]
 
     return population, labels
@@ -186,7 +221,7 @@ def get_population(
 
 def lengths_to_adj_list(label_connections: ndarray, lengths: array_like) -> adj_list:
     """
-    Convert a array_like of lengths between body parts to an adjacency list.
+    Convert an array_like of lengths between body parts to an adjacency list.
 
     Parameters
     ----------
@@ -216,12 +251,15 @@ def lengths_to_adj_list(label_connections: ndarray, lengths: array_like) -> adj_
     last_part = int(label_connections.max())
     label_adj_list: dict = {i: {} for i in range(last_part + 1)}
 
-    n_rows = len(label_connections)
+    # The total length from label u to label v is a difference of cumulative sums,
+    # so the lengths do not need to be summed again for each connection.
+    lengths_cumulative = np.concatenate(([0], np.cumsum(lengths)))
 
-    for i in range(n_rows):
-        u, v = label_connections[i, 0], label_connections[i, 1]
+    # Read the connections as pairs of ints once,
+    # instead of indexing the array for each element.
+    for u, v in label_connections.tolist():
 
-        label_adj_list[u][v] = sum(lengths[u:v])
+        label_adj_list[u][v] = lengths_cumulative[v] - lengths_cumulative[u]
 
     return label_adj_list
 
@@ -231,7 +269,7 @@ def pop_shortest_paths(
     labels: ndarray,
     label_adj_list: adj_list,
     weight_func: func_ab,
-) -> Tuple[Mapping[int, int], Mapping[int, float]]:
+) -> Tuple[ndarray, ndarray]:
     """
     Calculate shortest paths on the population of body parts.
 
@@ -242,6 +280,7 @@ def pop_shortest_paths(
     labels : (N,) ndarray
         Array of labels for N positions.
         The labels correspond to body part types (e.g., foot).
+        They are sorted in ascending order.
     label_adj_list : dict
         Adjacency list for the labels.
         label_adj_list[A][B] is the expected distance between
@@ -251,42 +290,51 @@ def pop_shortest_paths(
 
     Returns
     -------
-    prev : dict
+    prev : (N,) ndarray
         For each node u in the graph, prev[u] is the previous node
         on the shortest path to u.
-    dist : dict
+        The value is -1 if there is no previous node.
+    dist : (N,) ndarray
         For each node u in the graph, dist[u] is the total distance (weight)
         of the shortest path to u.
 
     """
     # Represent population as a weighted directed acyclic graph
-    pop_graph = gr.points_to_graph(dist_matrix, labels, label_adj_list, weight_func)
+    adj_matrix = gr.points_to_adj_matrix(
+        dist_matrix, labels, label_adj_list, weight_func
+    )
 
     # Run shortest path algorithm
-    head_nodes = np.where(labels == 0)[0]  # Source nodes
-    order = list(pop_graph.keys())  # Topological ordering of the nodes
+    # Source nodes
+    # The labels are sorted, so the head nodes are at the start.
+    head_nodes = np.arange(np.searchsorted(labels, 0, side='right'))
+
+    # Topological ordering of the nodes
+    # The labels are sorted, so each edge goes from a lower to a higher node.
+    order = range(len(labels))
 
-    prev, dist = gr.dag_shortest_paths(pop_graph, order, head_nodes)
+    prev, dist = gr.dag_shortest_paths_matrix(adj_matrix, order, head_nodes)
 
     return prev, dist
 
 
 def paths_to_foot(
-    prev: Mapping[int, int], dist: Mapping[int, float], labels: ndarray
+    prev: ndarray, dist: ndarray, labels: ndarray
 ) -> Tuple[ndarray, ndarray]:
     """
     Retrieve the shortest path to each foot position.
 
     Parameters
     ----------
-    prev : dict
+    prev : (N,) ndarray
         For each node u in the graph, prev[u] is the previous node
         on the shortest path to u.
-    dist : dict
+    dist : (N,) ndarray
         For each node u in the graph, dist[u] is the total distance (weight)
         of the shortest path to u.
-    labels : ndarray
+    labels : (N,) ndarray
         Label of each node.
+        The labels are sorted in ascending order.
 
     Returns
     -------
@@ -296,10 +344,15 @@ def paths_to_foot(
     path_dist : ndarray
         Total distance of the path to each foot.
 
+    Raises
+    ------
+    ValueError
+        If there is no path from a head node to one of the feet.
+
     Examples
     --------
-    >>> prev = {0: np.nan, 1: 0, 2: 1, 3: 2, 4: 3, 5: 3}
-    >>> dist = {0: 0, 1: 0, 2: 20, 3: 5, 4: 11, 5: 10}
+    >>> prev = np.array([-1, 0, 1, 2, 3, 3])
+    >>> dist = np.array([0, 0, 20, 5, 11, 10])
 
     >>> labels = np.array([0, 1, 2, 3, 4, 4])
 
@@ -313,20 +366,30 @@ def paths_to_foot(
     array([11., 10.])
 
     """
-    max_label = max(labels)
+    # The labels are sorted, so the feet have the last label and are at the end.
+    max_label = labels[-1]
 
-    foot_index = np.where(labels == max_label)[0]
+    foot_index = np.arange(np.searchsorted(labels, max_label), len(labels))
     n_feet = len(foot_index)
 
-    paths = np.full((n_feet, max_label + 1), np.nan)
-    path_dist = np.full(n_feet, np.nan)
+    paths = np.zeros((n_feet, max_label + 1), dtype=int)
 
-    for i, foot in enumerate(foot_index):
+    # Each path has one node for each label, from head to foot.
+    # All paths are traced back together, one label at a time.
+    nodes = foot_index
 
-        paths[i, :] = gr.trace_path(prev, foot)
-        path_dist[i] = dist[foot]
+    for j in range(max_label, -1, -1):
 
-    return paths.astype(int), path_dist
+        # A previous node of -1 would silently index the last node.
+        if np.any(nodes < 0):
+            raise ValueError("A foot cannot be reached from a head node.")
+
+        paths[:, j] = nodes
+        nodes = prev[nodes]
+
+    path_dist = dist[foot_index].astype(float)
+
+    return paths, path_dist
 
 
 def get_scores(
@@ -350,8 +413,8 @@ def get_scores(
         label_adj_list[A][B] is the expected distance between
         a point with label A and a point with label B.
     score_func : function
-        Function of form f(a, b) -> c.
-        Outputs a score given a measured distance and an expected distance.
+        Function of form f(A, B) -> C operating on arrays.
+        Outputs the scores given measured distances and expected distances.
 
     Returns
     -------
@@ -359,25 +422,28 @@ def get_scores(
        Array of scores.
 
     """
-    score_matrix = np.zeros(dist_matrix.shape)
+    # Integer distances give floating point scores.
+    score_matrix = np.zeros(
+        dist_matrix.shape, dtype=np.result_type(dist_matrix.dtype, np.float32)
+    )
     n_paths, n_path_nodes = paths.shape
 
-    for i in range(n_paths):
-        for j in range(n_path_nodes):
-            for k in range(j, n_path_nodes):
+    # Expected lengths between the labels, i.e., the positions along a path.
+    label_dist = gr.adj_list_to_matrix(label_adj_list)[:n_path_nodes, :n_path_nodes]
 
-                if k in label_adj_list[j]:
-                    # These vertices are connected by a body link and
-                    # are in the same shortest path
-                    u, v = paths[i, j], paths[i, k]
+    # Pairs of path positions (j, k) with j <= k that are connected by a body link
+    index_j, index_k = np.nonzero(np.triu(~np.isnan(label_dist)))
 
-                    length_expected = label_adj_list[j][k]
-                    length_measured = dist_matrix[u, v]
+    # The vertices of these connections along every shortest path.
+    # All connections are scored in one call.
+    index_u, index_v = paths[:, index_j].ravel(), paths[:, index_k].ravel()
+    lengths_expected = np.tile(label_dist[index_j, index_k], n_paths)
 
-                    score_matrix[u, v] = score_func(length_measured, length_expected)
+    lengths_measured = dist_matrix[index_u, index_v]
+    score_matrix[index_u, index_v] = score_func(lengths_measured, lengths_expected)
 
     # Ensure that all values are finite so the elements can be summed
-    score_matrix[~np.isfinite(score_matrix)] = 0
+    np.nan_to_num(score_matrix, copy=False, nan=0, posinf=0, neginf=0)
 
     return score_matrix
 
@@ -469,11 +535,20 @@ def in_spheres(within_radius: ndarray, has_sphere: ndarray) -> ndarray:
         Boolean array.
         Element i is True if position i is within the combined sphere volume.
 
-    """
-    n = len(has_sphere)
-    tiled = np.tile(has_sphere, (n, 1))
+    Examples
+    --------
+    >>> within_radius = np.array([[1, 1, 0], [1, 1, 0], [0, 0, 1]], dtype=bool)
 
-    return np.any(tiled * within_radius, 1)
+    >>> in_spheres(within_radius, np.array([True, False, False]))
+    array([ True,  True, False])
+
+    >>> in_spheres(within_radius, np.array([False, False, True]))
+    array([False, False,  True])
+
+    """
+    # Only the columns of the sphere centres are reduced,
+    # instead of masking a tiled copy of the full matrix.
+    return np.any(within_radius[:, has_sphere], axis=1)
 
 
 def select_best_feet(
@@ -485,6 +560,11 @@ def select_best_feet(
     """
     Select the best two feet from multiple hypotheses.
 
+    For each radius, the pairs of feet with the maximum score get a vote.
+    Scores that are equal up to rounding error are counted as a tie,
+    and each tied pair gets a vote.
+    The first pair with the most votes is selected.
+
     Parameters
     ----------
     dist_matrix : (N, N) ndarray
@@ -509,42 +589,37 @@ def select_best_feet(
     pairs = [*itertools.combinations(range(n_paths), 2)]
     n_pairs = len(pairs)
 
-    votes, pair_scores = np.zeros(n_pairs), np.zeros(n_pairs)
-
-    for r in radii:
-
-        within_radius = dist_matrix < r
-
-        for i in range(n_pairs):
+    index_a, index_b = np.reshape(pairs, (n_pairs, 2)).T
 
-            a, b = pairs[i]
+    # Element (r, i, j) is True if position i is within radius r of position j.
+    within_radius = dist_matrix < np.reshape(radii, (-1, 1, 1))
 
-            has_sphere_1 = path_vectors[a, :]
-            has_sphere_2 = path_vectors[b, :]
+    # Element (r, i, p) is True if position i is inside a sphere of radius r
+    # centred on a position of path p.
+    # A boolean matrix product is the logical OR of the logical ANDs.
+    inside_paths = within_radius @ path_vectors.T
 
-            # Element i is True if i is the centre of a sphere
-            has_sphere = np.logical_or(has_sphere_1, has_sphere_2)
+    # Element (r, i, c) is True if position i is inside the combined sphere
+    # volume of pair c, i.e., inside the spheres of either path.
+    inside_pairs = inside_paths[:, :, index_a] | inside_paths[:, :, index_b]
+    inside_pairs = inside_pairs.astype(float)
 
-            # For type checker: cast Union[generic, ndarray] to ndarray.
-            has_sphere = cast(ndarray, has_sphere)
+    # The score of a pair sums the scores of the links between positions
+    # that are both inside the combined sphere volume.
+    # Element (r, c) is the score of pair c for radius r.
+    # The sum is in double precision, even if the score matrix is not.
+    pair_scores = np.einsum('ric,ij,rjc->rc', inside_pairs, score_matrix, inside_pairs)
 
-            # Element i is True if i is inside the combined sphere volume
-            inside_spheres = in_spheres(within_radius, has_sphere)
+    # The winning pairs for each radius get a vote.
+    # The order of the sum affects the last bits of the scores,
+    # so pairs with the same score up to rounding are all winners.
+    max_scores = pair_scores.max(axis=1, keepdims=True)
+    radius_winners = np.isclose(pair_scores, max_scores, rtol=1e-9, atol=1e-12)
 
-            in_spheres_col = inside_spheres.reshape(-1, 1)
-            score_included = in_spheres_col @ in_spheres_col.T
-            pair_scores[i] = np.sum(score_matrix[score_included])
+    # Element c is the number of radii for which pair c is a winner.
+    votes = np.count_nonzero(radius_winners, axis=0)
 
-        max_score = max(pair_scores)
-
-        # Winning pairs for this radius
-        radius_winners = pair_scores == max_score
-
-        # Votes go to the winners
-        votes += radius_winners
-
-    winning_pair = int(np.argmax(votes))
-    foot_1, foot_2 = pairs[winning_pair]
+    foot_1, foot_2 = pairs[np.argmax(votes)]
 
     return foot_1, foot_2
 
@@ -599,7 +674,8 @@ def foot_to_pop(
 def process_frame(
     population: ndarray,
     labels: ndarray,
-    lengths: ndarray,
+    label_adj_list_types: adj_list,
+    label_adj_list_parts: adj_list,
     radii: array_like,
     cost_func: func_ab,
     score_func: func_ab,
@@ -617,8 +693,12 @@ def process_frame(
     labels : (N,) ndarray
         Array of labels for N positions.
         The labels correspond to body part types (e.g., foot).
-    lengths : (N_lengths,) ndarray
-        Lengths between adjacent body parts.
+    label_adj_list_types : dict
+        Adjacency list for the body part types.
+        The expected lengths are constant for a walking trial,
+        so the list is made once per trial with `lengths_to_adj_list`.
+    label_adj_list_parts : dict
+        Adjacency list for the connected body parts along a path.
     radii : array_like
         List of radii used to select the best feet.
     cost_func : function
@@ -633,10 +713,10 @@ def process_frame(
         One point for each label (i.e., each body part type).
 
     """
-    dist_matrix = cdist(population, population)
-
-    label_adj_list_types = lengths_to_adj_list(TYPE_CONNECTIONS, lengths)
-    label_adj_list_parts = lengths_to_adj_list(PART_CONNECTIONS, lengths)
+    # The distance matrix is symmetric, so each distance only needs to be computed once.
+    # The distances are single precision like the coordinates (see process_kinect),
+    # which halves the memory of the matrices derived from them.
+    dist_matrix = squareform(pdist(population).astype(np.float32))
 
     # Run shortest path algorithm on the body graph
     prev, dist = pop_shortest_paths(
@@ -648,7 +728,7 @@ def process_frame(
 
     pop_reduced, paths_reduced = reduce_population(population, paths)
 
-    dist_matrix_reduced = cdist(pop_reduced, pop_reduced)
+    dist_matrix_reduced = squareform(pdist(pop_reduced).astype(np.float32))
     score_matrix = get_scores(
         dist_matrix_reduced, paths_reduced, label_adj_list_parts, score_func
     )
@@ -139,36 +139,45 @@ def assign_sides_grouped(
 
     """
     labels_unique = np.unique(labels_grouped[labels_grouped != -1])
-    set_labels_r = set()
+    n_labels = len(labels_unique)
 
-    for label in labels_unique:
+    # Element (i, j) is True if foot point i is in cluster j.
+    is_cluster = labels_grouped.reshape(-1, 1) == labels_unique
 
-        is_cluster = labels_grouped == label
+    # Element (f, j) is True if unique frame f has a foot point in cluster j.
+    frames_unique, index_frames = np.unique(frames_grouped, return_inverse=True)
+    has_cluster = np.zeros((len(frames_unique), n_labels), dtype=bool)
+    np.logical_or.at(has_cluster, index_frames, is_cluster)
 
-        # Element is True for all cluster frames in the grouped array.
-        is_frame_cluster = np.in1d(frames_grouped, frames_grouped[is_cluster])
+    # Element (i, j) is True if foot point i occurred on a frame in cluster j,
+    # but is not a part of the cluster itself. This means it is a swing foot.
+    is_foot_swing = has_cluster[index_frames] & ~is_cluster
 
-        # Element is True if the corresponding foot point occurred on a frame in the cluster,
-        # but is not a part of the cluster itself. This means it is a swing foot.
-        is_foot_swing = is_frame_cluster & ~is_cluster
+    # Side values of all foot points for each cluster.
+    values_side_tiled = np.broadcast_to(
+        values_side_grouped.reshape(-1, 1), is_cluster.shape
+    )
 
-        value_side_stance = np.median(values_side_grouped[is_cluster])
+    # The points outside each cluster are masked, so they are not in its median.
+    # Masking keeps the nan values of the points in the cluster, as with np.median.
+    values_side_stance = np.ma.median(
+        np.ma.masked_array(values_side_tiled, ~is_cluster), axis=0
+    ).filled(np.nan)
 
-        if is_foot_swing.sum() > 0:
-            value_side_swing = np.median(values_side_grouped[is_foot_swing])
-        else:
-            # It's possible that there are no swing feet in the cluster.
-            # In this case, the swing value is assumed to be zero.
-            value_side_swing = 0
+    # It's possible that there are no swing feet in the cluster.
+    # In this case, the swing value is assumed to be zero.
+    values_side_swing = np.zeros(n_labels)
+    has_swing = is_foot_swing.any(axis=0)
 
-        if value_side_stance > value_side_swing:
-            # The current label is on the right side.
-            set_labels_r.add(label)
+    values_side_swing[has_swing] = np.ma.median(
+        np.ma.masked_array(values_side_tiled, ~is_foot_swing)[:, has_swing], axis=0
+    ).filled(np.nan)
 
-    set_labels_l = set(labels_unique) - set_labels_r
+    # The clusters with a stance value greater than the swing value are on the right side.
+    is_label_r = values_side_stance > values_side_swing
 
-    is_label_grouped_l = np.in1d(labels_grouped, list(set_labels_l))
-    is_label_grouped_r = np.in1d(labels_grouped, list(set_labels_r))
+    is_label_grouped_l = np.isin(labels_grouped, labels_unique[~is_label_r])
+    is_label_grouped_r = np.isin(labels_grouped, labels_unique[is_label_r])
 
     labels_grouped_l = np.copy(labels_grouped)
     labels_grouped_r = np.copy(labels_grouped)
@@ -36,7 +36,7 @@ def main():
         points = np.vstack([points_a, points_b])
 
         pl.scatter2(ax, points, c=gray, s=50)
-        pl.connect_two_sets(ax, points_a, points_b, c=gray)
+        pl.connect_two_sets(ax, points_a, points_b, colors=gray)
 
     # Emphasize shortest path
 
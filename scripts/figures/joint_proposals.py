@@ -36,7 +36,10 @@ def scatter_parts(ax, points, labels, name_cmap: str = 'Set1', **kwargs):
 
     """
 
-    labels_unique = np.unique(labels)
+    # Group the point indices by label with one sort,
+    # instead of comparing all labels to each unique label.
+    index_sorted = np.argsort(labels, kind='stable')
+    index_split = np.flatnonzero(np.diff(labels[index_sorted])) + 1
 
     cmap = get_cmap(name_cmap)
 
@@ -44,9 +47,9 @@ def scatter_parts(ax, points, labels, name_cmap: str = 'Set1', **kwargs):
         marker=['o', '^', 's', '*', 'P', 'X']
     )
 
-    for label, dict_format in zip(labels_unique, cycler_):
+    for index_label, dict_format in zip(np.split(index_sorted, index_split), cycler_):
 
-        points_label = points[labels == label]
+        points_label = points[index_label]
 
         ax.scatter(points_label[:, 0], points_label[:, 1], **dict_format, **kwargs)
 
@@ -87,9 +90,7 @@ def main():
     frame = image_to_frame[image_number]
     population, labels = df_hypo.loc[trial_name].loc[frame]
 
-    points_image = np.apply_along_axis(
-        im.real_to_image, 1, population, im.X_RES, im.Y_RES, im.F_XZ, im.F_YZ
-    )
+    points_image = im.real_to_image(population, im.X_RES, im.Y_RES, im.F_XZ, im.F_YZ)
 
     # %% Plot joint proposals on depth image
 
@@ -159,6 +160,9 @@ def main():
 
     n_figs = len(pairs)
 
+    # The radius is the same for every figure
+    within_radius = dist_matrix_reduced < r
+
     for i in range(n_figs):
         fig, ax = plt.subplots()
 
@@ -169,12 +173,10 @@ def main():
             ax.legend(part_types, loc=legend_location, edgecolor='k')
 
         has_sphere = np.any(path_vectors[pairs[i]], 0)
-        within_radius = dist_matrix_reduced < r
 
         inside_spheres = pe.in_spheres(within_radius, has_sphere)
         pl.plot_links(ax, pop_reduced, score_matrix, inside_spheres)
 
-        has_sphere = np.any(path_vectors[pairs[i]], 0)
         pl.plot_spheres(ax, pop_reduced[has_sphere], r)
 
         ax.set_axis('equal')
@@ -1,6 +1,8 @@
 """Estimate lengths of the body for each trial."""
 
 import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from os.path import join
 
 import pandas as pd
@@ -17,15 +19,20 @@ def main():
 
     # %% Calculate lengths for each walking trial
 
+    trial_names, dfs_hypo_trial = zip(*df_hypo.groupby(level=0))
+
     list_lengths = []
 
-    for trial_name, df_hypo_trial in df_hypo.groupby(level=0):
+    # The trials are independent, so they are run in parallel processes.
+    with ProcessPoolExecutor() as executor:
+
+        results = executor.map(partial(pe.estimate_lengths, atol=0.1), dfs_hypo_trial)
 
-        print(trial_name)
+        for trial_name, lengths_estimated in zip(trial_names, results):
 
-        lengths_estimated = pe.estimate_lengths(df_hypo_trial, atol=0.1)
+            print(trial_name)
 
-        list_lengths.append(lengths_estimated)
+            list_lengths.append(lengths_estimated)
 
     df_lengths = pd.DataFrame(list_lengths, index=trials_to_run)
     df_lengths.to_csv(join('data', 'kinect', 'kinect_lengths.csv'))
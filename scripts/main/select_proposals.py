@@ -7,6 +7,7 @@ import numpy as np
 import pandas as pd
 
 import modules.pose_estimation as pe
+from modules.constants import PART_CONNECTIONS, TYPE_CONNECTIONS
 
 
 def main():
@@ -35,13 +36,24 @@ def main():
 
         lengths = df_length.loc[trial_name]  # Read estimated lengths for trial
 
+        # The adjacency lists only depend on the lengths,
+        # so they are made once for the whole trial.
+        label_adj_list_types = pe.lengths_to_adj_list(TYPE_CONNECTIONS, lengths)
+        label_adj_list_parts = pe.lengths_to_adj_list(PART_CONNECTIONS, lengths)
+
         for tuple_frame in df_trial.itertuples():
 
             population, labels = tuple_frame.population, tuple_frame.labels
 
             # Select the best two shortest paths
             pos_1, pos_2 = pe.process_frame(
-                population, labels, lengths, radii, pe.cost_func, pe.score_func
+                population,
+                labels,
+                label_adj_list_types,
+                label_adj_list_parts,
+                radii,
+                pe.cost_func,
+                pe.score_func,
             )
 
             # Positions of the best head and two feet
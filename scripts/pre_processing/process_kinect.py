@@ -35,14 +35,16 @@ def main():
             skiprows=range(22),
             header=None,
             names=range(-2, n_coord_cols),
+            dtype={-2: str},
             sep='\t',
-            skipfooter=1,  # The last night says "Quit button pressed"
-            engine='python',
         )
 
         # Label some columns
         df_raw = df_raw.rename(columns={-2: 'frame', -1: 'part'})
 
+        # The last line says "Quit button pressed"
+        df_raw = df_raw.iloc[:-1].astype({'frame': int})
+
         # Crop the DataFrame at the max frame number
         # (the text file loops back to the beginning)
         max_frame = df_raw.frame.max()
@@ -59,48 +61,62 @@ def main():
         df_hypo_raw = df_hypo_raw.dropna(how='all')
 
         # Convert elements floats because they
-        # are 3D coordinates
-        df_hypo_raw = df_hypo_raw.astype(np.float64)
+        # are 3D coordinates.
+        # Single precision is plenty for the resolution of the Kinect.
+        df_hypo_raw = df_hypo_raw.astype(np.float32)
 
         # Extract unique index values
         frames = df_hypo_raw.index.get_level_values(0).unique()
 
-        df_hypo_types = pd.DataFrame(index=frames, columns=PART_TYPES)
-
-        for part_type in PART_TYPES:
-
-            # Booleans marking rows of one part type (e.g. FOOT)
-            row_is_type = df_hypo_raw.index.get_level_values(1).str.contains(part_type)
-
-            # Only contains rows for one part type
-            df_hypo_raw_type = df_hypo_raw[row_is_type]
-
-            for frame, df_frame in df_hypo_raw_type.groupby(level=0):
-
-                # Combine the coordinates of body parts with the same type
-                # e.g. L_FOOT and R_FOOT
-                coords_part_type = df_frame.values.flatten()
-                coords_part_type = coords_part_type[~np.isnan(coords_part_type)]
-
-                if coords_part_type.size == 0:
-                    continue
-
-                # Reshape into array of 3D points
-                points_part_type = coords_part_type.reshape(-1, 3)
-
-                # The hypothetical positions now need to be converted from
-                # real to image then back to real using new parameters.
-                points_part_type = im.recalibrate_positions(
-                    points_part_type,
-                    im.X_RES_ORIG,
-                    im.Y_RES_ORIG,
-                    im.X_RES,
-                    im.Y_RES,
-                    im.F_XZ,
-                    im.F_YZ,
-                )
+        # Part type of each row (e.g. FOOT for both L_FOOT and R_FOOT)
+        pattern_types = '({})'.format('|'.join(PART_TYPES))
+        part_types_rows = df_hypo_raw.index.get_level_values(1).str.extract(
+            pattern_types, expand=False
+        )
 
-                df_hypo_types.loc[frame, part_type] = points_part_type
+        frames_rows = df_hypo_raw.index.get_level_values(0)
+
+        dict_types: dict = {part_type: {} for part_type in PART_TYPES}
+
+        # Group the rows by frame and part type in one pass.
+        # The frames are already in order, so the groups do not need sorting.
+        for (frame, part_type), df_frame in df_hypo_raw.groupby(
+            [frames_rows, part_types_rows], sort=False
+        ):
+
+            # Combine the coordinates of body parts with the same type
+            # e.g. L_FOOT and R_FOOT, and reshape into array of 3D points
+            points_part_type = df_frame.to_numpy().reshape(-1, 3)
+
+            # Drop the empty coordinate columns
+            points_part_type = points_part_type[~np.isnan(points_part_type).any(axis=1)]
+
+            if points_part_type.size == 0:
+                continue
+
+            # The hypothetical positions now need to be converted from
+            # real to image then back to real using new parameters.
+            points_part_type = im.recalibrate_positions(
+                points_part_type,
+                im.X_RES_ORIG,
+                im.Y_RES_ORIG,
+                im.X_RES,
+                im.Y_RES,
+                im.F_XZ,
+                im.F_YZ,
+            )
+
+            dict_types[part_type][frame] = points_part_type
+
+        # Build the DataFrame once instead of assigning each element by label
+        df_hypo_types = pd.DataFrame(
+            {
+                part_type: pd.Series(dict_frames, dtype=object)
+                for part_type, dict_frames in dict_types.items()
+            },
+            index=frames,
+            columns=PART_TYPES,
+        )
 
         dict_trials[trial_name] = df_hypo_types
 
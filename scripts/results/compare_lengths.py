@@ -29,11 +29,15 @@ def main():
     df_truth_r = df_truth.loc[:, parts_r].dropna()
 
     # Measured lengths of labelled trials on each frame
-    lengths_truth_l = df_truth_l.apply(
-        lambda row: pp.consecutive_dist(np.stack(row)), axis=1
+    # The positions are stacked into (n_frames, n_parts, 3) arrays,
+    # so the lengths of all frames are calculated at once.
+    lengths_truth_l = pd.DataFrame(
+        pp.consecutive_dist(np.stack(df_truth_l.to_numpy().tolist())),
+        index=df_truth_l.index,
     )
-    lengths_truth_r = df_truth_r.apply(
-        lambda row: pp.consecutive_dist(np.stack(row)), axis=1
+    lengths_truth_r = pd.DataFrame(
+        pp.consecutive_dist(np.stack(df_truth_r.to_numpy().tolist())),
+        index=df_truth_r.index,
     )
 
     labelled_trial_names = df_truth.index.get_level_values(0).unique()
@@ -49,7 +53,7 @@ def main():
         lengths_trial = pd.concat((lengths_trial_l, lengths_trial_r))
 
         # Median lengths for the trial
-        lengths_truth = np.median(np.stack(lengths_trial), axis=0)
+        lengths_truth = np.median(lengths_trial.to_numpy(), axis=0)
 
         df_compare_trial = pd.DataFrame(
             {
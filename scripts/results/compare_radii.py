@@ -6,6 +6,7 @@ import numpy as np
 import pandas as pd
 
 import modules.pose_estimation as pe
+from modules.constants import PART_CONNECTIONS, TYPE_CONNECTIONS
 
 
 def main():
@@ -20,6 +21,16 @@ def main():
     labelled_trial_names = df_truth.index.get_level_values(0).unique()
     df_hypo_labelled = df_hypo.loc[labelled_trial_names]
 
+    # The adjacency lists of a trial do not depend on the radii,
+    # so they are made once and reused for every maximum radius.
+    dict_adj_lists = {
+        trial_name: (
+            pe.lengths_to_adj_list(TYPE_CONNECTIONS, df_length.loc[trial_name]),
+            pe.lengths_to_adj_list(PART_CONNECTIONS, df_length.loc[trial_name]),
+        )
+        for trial_name in labelled_trial_names
+    }
+
     list_dfs_radii = []
     radii_max = range(11)
 
@@ -35,7 +46,7 @@ def main():
 
         for trial_name, df_hypo_trial in df_hypo_labelled.groupby(level=0):
 
-            lengths = df_length.loc[trial_name]  # Read estimated lengths for trial
+            label_adj_list_types, label_adj_list_parts = dict_adj_lists[trial_name]
 
             for tuple_frame in df_hypo_trial.itertuples():
 
@@ -43,7 +54,13 @@ def main():
 
                 # Select the best two shortest paths
                 pos_1, pos_2 = pe.process_frame(
-                    population, labels, lengths, radii, pe.cost_func, pe.score_func
+                    population,
+                    labels,
+                    label_adj_list_types,
+                    label_adj_list_parts,
+                    radii,
+                    pe.cost_func,
+                    pe.score_func,
                 )
 
                 # Positions of the best head and two feet
@@ -31,3 +31,24 @@ def test_coordinate_conversion(point_real, x_res, y_res, f_xz, f_yz):
     point_real_new = im.image_to_real(point_proj, x_res, y_res, f_xz, f_yz)
 
     assert np.allclose(point_real, point_real_new, rtol=1e-3)
+
+
+@given(
+    arrays('float', (5, 3), elements=st.integers(min_value=1, max_value=1e6)),
+    pos_floats,
+    pos_floats,
+)
+def test_coordinate_conversion_points(points_real, f_xz, f_yz):
+    """Test converting multiple points at once."""
+    x_res, y_res = 640, 480
+
+    points_image = im.real_to_image(points_real, x_res, y_res, f_xz, f_yz)
+
+    for point_real, point_image in zip(points_real, points_image):
+        assert np.allclose(
+            point_image, im.real_to_image(point_real, x_res, y_res, f_xz, f_yz)
+        )
+
+    points_real_new = im.image_to_real(points_image, x_res, y_res, f_xz, f_yz)
+
+    assert np.allclose(points_real, points_real_new, rtol=1e-3)
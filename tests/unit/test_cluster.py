@@ -78,3 +78,30 @@ def test_dbscan_st(walking_pass_points):
         min_pts=2,
     )
     assert np.all(labels == -1)
+
+
+def test_dbscan_st_non_finite():
+    """Test that points with non-finite coordinates are labelled as noise."""
+
+    points = [[0], [1], [np.nan], [2], [3]]
+    times = [0, 1, 2, 3, 4]
+
+    labels = cl.dbscan_st(
+        points, times=times, eps_spatial=1.5, eps_temporal=5, min_pts=2
+    )
+    assert_array_equal(labels, [0, 0, -1, 0, 0])
+
+    points = [[0, 0], [np.inf, 0], [1, 0], [0, 1]]
+
+    labels = cl.dbscan_st(points, eps_spatial=1, min_pts=2)
+    assert_array_equal(labels, [0, -1, 0, 0])
+
+    # A non-finite point is not in its own neighbourhood, so it is noise even if min_pts is one.
+    labels = cl.dbscan_st([[0], [np.nan], [5]], eps_spatial=1, min_pts=1)
+    assert_array_equal(labels, [0, -1, 1])
+
+    # The same applies to a point with a non-finite time.
+    labels = cl.dbscan_st(
+        [[0], [1], [5]], times=[0, np.nan, 2], eps_spatial=1, eps_temporal=5, min_pts=1
+    )
+    assert_array_equal(labels, [0, -1, 1])
@@ -98,6 +98,24 @@ def test_shortest_paths(directed_acyclic_graph, node_target, path):
     assert gr.trace_path(prev, node_target) == path
 
 
+def test_shortest_paths_matrix(directed_acyclic_graph):
+
+    graph, order, nodes_source = directed_acyclic_graph
+
+    prev, dist = gr.dag_shortest_paths(graph, order, nodes_source)
+
+    adj_matrix = gr.adj_list_to_matrix(graph)
+    prev_array, dist_array = gr.dag_shortest_paths_matrix(
+        adj_matrix, order, nodes_source
+    )
+
+    # A missing previous node is -1 instead of nan.
+    prev_expected = [-1 if np.isnan(prev[v]) else prev[v] for v in order]
+
+    assert np.array_equal(prev_array, prev_expected)
+    assert np.array_equal(dist_array, [dist[v] for v in order])
+
+
 def test_labelled_nodes_to_graph(label_graph):
 
     node_labels, label_adj_list, graph_expected = label_graph
@@ -105,3 +123,21 @@ def test_labelled_nodes_to_graph(label_graph):
     graph_from_labels = gr.labelled_nodes_to_graph(node_labels, label_adj_list)
 
     assert graph_from_labels == graph_expected
+
+
+@pytest.mark.parametrize("dtype", [int, np.float32, float])
+def test_points_to_adj_matrix(dtype):
+
+    dist_matrix = np.array([[0, 7, 2], [7, 0, 7], [2, 7, 0]], dtype=dtype)
+    labels = [0, 1, 1]
+    label_adj_list = {0: {1: 5}, 1: {}}
+
+    adj_matrix = gr.points_to_adj_matrix(
+        dist_matrix, labels, label_adj_list, lambda a, b: abs(a - b)
+    )
+
+    # The missing edges are nan even for integer distances.
+    assert np.issubdtype(adj_matrix.dtype, np.floating)
+    assert np.array_equal(
+        adj_matrix, [[nan, 2, 3], [nan, nan, nan], [nan, nan, nan]], equal_nan=True
+    )
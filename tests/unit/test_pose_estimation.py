@@ -1,6 +1,7 @@
 """Unit tests for pose estimation from multiple joint proposals."""
 
 import numpy as np
+import pandas as pd
 import pytest
 from scipy.spatial.distance import cdist
 
@@ -38,4 +39,104 @@ def test_pop_shortest_paths(sample_population):
         dist_matrix, labels, label_adj_list, pe.cost_func
     )
 
-    assert prev == {0: np.nan, 1: np.nan, 2: 0, 3: 0, 4: 2, 5: 2}
+    assert np.array_equal(prev, [-1, -1, 0, 0, 2, 2])
+
+
+@pytest.mark.parametrize(
+    "a, b, expected",
+    [(10, 10, 1), (5, 10, 0), (10, 5, 0), (8, 10, 0.9375), (10, 8, 0.9375)],
+)
+def test_score_func(a, b, expected):
+
+    assert np.isclose(pe.score_func(a, b), expected)
+
+    # The scores of many links are computed in one call.
+    scores = pe.score_func(np.full(3, a), np.full(3, b))
+    assert np.allclose(scores, expected)
+
+
+def test_select_best_feet_tie():
+    """Pairs of feet with the same score up to rounding are both winners."""
+    # Each path has its own positions, and the distances are large,
+    # so a small sphere only contains the centre position.
+    dist_matrix = np.full((5, 5), 10.0)
+    np.fill_diagonal(dist_matrix, 0)
+
+    path_vectors = np.zeros((3, 5), dtype=bool)
+    path_vectors[0, 0] = True
+    path_vectors[1, [1, 2]] = True
+    path_vectors[2, [3, 4]] = True
+
+    # Pairs (0, 1) and (0, 2) both have links with scores 0.1, 0.2 and 0.3,
+    # but summed in a different order. Pair (1, 2) has a lower score.
+    score_matrix = np.zeros((5, 5))
+    score_matrix[0, 1], score_matrix[0, 2], score_matrix[1, 2] = 0.3, 0.2, 0.1
+    score_matrix[0, 3], score_matrix[0, 4], score_matrix[3, 4] = 0.1, 0.2, 0.3
+
+    # The sums differ in the last bit.
+    assert 0.3 + 0.2 + 0.1 != 0.1 + 0.2 + 0.3
+
+    # Both pairs get a vote for each radius, so the first pair is selected.
+    assert pe.select_best_feet(dist_matrix, score_matrix, path_vectors, [1, 2]) == (
+        0,
+        1,
+    )
+
+    # Two pairs that are exactly tied are also both winners.
+    score_matrix[0, 3], score_matrix[0, 4], score_matrix[3, 4] = 0.3, 0.2, 0.1
+
+    assert pe.select_best_feet(dist_matrix, score_matrix, path_vectors, [1, 2]) == (
+        0,
+        1,
+    )
+
+
+def test_estimate_lengths():
+    """The lengths are estimated even if the medians do not converge in the trial."""
+    labels = np.arange(6)
+
+    # The parts are on a vertical line, with different spacing on each frame.
+    # The median of the lengths changes on every frame, so it does not converge.
+    population_1 = np.zeros((6, 3))
+    population_1[:, 1] = -10 * labels
+
+    population_2 = np.zeros((6, 3))
+    population_2[:, 1] = -20 * labels
+
+    df_hypo_trial = pd.DataFrame(
+        {'population': [population_1, population_2], 'labels': [labels, labels]}
+    )
+
+    lengths = pe.estimate_lengths(df_hypo_trial)
+
+    assert np.allclose(lengths, 15)
+
+    # The lengths stay at zero for a trial without frames.
+    df_empty = pd.DataFrame({'population': [], 'labels': []})
+
+    assert np.array_equal(pe.estimate_lengths(df_empty), np.zeros(5))
+
+
+def test_paths_to_foot_unreachable():
+    """A foot that cannot be reached from the head gives an error."""
+    # The second foot has no previous node.
+    prev = np.array([-1, 0, 1, 2, 3, -1])
+    dist = np.array([0, 0, 20, 5, 11, np.inf])
+    labels = np.array([0, 1, 2, 3, 4, 4])
+
+    with pytest.raises(ValueError):
+        pe.paths_to_foot(prev, dist, labels)
+
+    # The first foot has a broken path further up.
+    prev = np.array([-1, 0, -1, 2, 3, 3])
+
+    with pytest.raises(ValueError):
+        pe.paths_to_foot(prev, dist, labels)
+
+
+def test_get_population_empty():
+    """A frame where every body part is empty gives an empty population."""
+    population, labels = pe.get_population([[], []], [5, 0])
+
+    assert population.shape == (0, 3)
+    assert labels.size == 0
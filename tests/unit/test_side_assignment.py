@@ -52,3 +52,30 @@ def test_compute_basis():
     npt.assert_array_equal(basis.forward, [1, 0, 0])
     npt.assert_array_equal(basis.up, [0, 1, 0])
     npt.assert_array_equal(basis.perp, [0, 0, -1])
+
+
+def test_assign_sides_grouped():
+
+    frames_grouped = np.array([0, 0, 1, 1, 2, 2, 3, 3])
+    labels_grouped = np.array([0, -1, 0, -1, 1, -1, 1, -1])
+
+    # Cluster 0 has larger side values than its swing feet, so it's on the right.
+    values_side_grouped = np.array([1, -1, 2, -2, 3, 1, 3, 1], dtype=float)
+
+    labels_grouped_l, labels_grouped_r = sa.assign_sides_grouped(
+        frames_grouped, values_side_grouped, labels_grouped
+    )
+
+    npt.assert_array_equal(labels_grouped_l, [-1, -1, -1, -1, -1, -1, -1, -1])
+    npt.assert_array_equal(labels_grouped_r, [0, -1, 0, -1, 1, -1, 1, -1])
+
+    # A nan value in a cluster makes its median nan, like np.median.
+    # The comparison with the swing value is then False, so the cluster is on the left.
+    values_side_grouped[6] = np.nan
+
+    labels_grouped_l, labels_grouped_r = sa.assign_sides_grouped(
+        frames_grouped, values_side_grouped, labels_grouped
+    )
+
+    npt.assert_array_equal(labels_grouped_l, [-1, -1, -1, -1, 1, -1, 1, -1])
+    npt.assert_array_equal(labels_grouped_r, [0, -1, 0, -1, -1, -1, -1, -1])